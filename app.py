@@ -1,4 +1,5 @@
 import os
+import logging
 import certifi
 import urllib.parse
 from datetime import datetime
@@ -13,7 +14,7 @@ import traceback
 from utils.file_utils import save_to_dataset, remove_duplicate_from_other_categories
 from utils.category_utils import get_categories
 from models.classifier import predict_image_file
-from utils.drive_util import upload_to_drive, delete_from_drive, move_in_drive  # ✅ updated imports
+from utils.drive_util import upload_many, delete_from_drive, move_in_drive  # ✅ updated imports
 
 # ---------------- Load Env ----------------
 load_dotenv()
@@ -33,6 +34,8 @@ DB_NAME = os.getenv("DB_NAME", "TrashApp")
 PORT = int(os.getenv("PORT", 5000))
 DEBUG = os.getenv("DEBUG", "True").lower() == "true"
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
 # ---------------- Flask App ----------------
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
@@ -59,10 +62,12 @@ def predict():
     filename = secure_filename(file.filename)
     timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
     saved_path = os.path.join(app.config["UPLOAD_FOLDER"], f"{timestamp}_{filename}")
-    file.save(saved_path)
+    image_bytes = file.read()
+    with open(saved_path, "wb") as f:
+        f.write(image_bytes)
 
     try:
-        result = predict_image_file(saved_path)
+        result = predict_image_file(saved_path, image_bytes=image_bytes)
         classification = result["objects"][0]  # first object
     except Exception as e:
         traceback.print_exc()
@@ -116,6 +121,7 @@ def upload_dataset_image():
         return jsonify({"error": "Main category required"}), 400
 
     results = []
+    drive_uploads = []
     for file in files:
         final_path, hash_value = save_to_dataset(file, hierarchy)
         remove_duplicate_from_other_categories(db, hash_value, final_path, hierarchy)
@@ -133,12 +139,7 @@ def upload_dataset_image():
         }
         db["dataset_images"].insert_one(record)
 
-        # ✅ Upload to Drive
-        drive_rel_path = f"dataset/{rel_path}"
-        try:
-            upload_to_drive(final_path, drive_rel_path)
-        except Exception as e:
-            print(f"⚠️ Drive upload failed: {e}")
+        drive_uploads.append((final_path, f"dataset/{rel_path}"))
 
         results.append({
             "message": "Image added",
@@ -147,6 +148,12 @@ def upload_dataset_image():
             "hierarchy": hierarchy,
         })
 
+    # ✅ Upload to Drive (all files at once; failures are logged, not fatal)
+    try:
+        upload_many(drive_uploads)
+    except Exception as e:
+        print(f"⚠️ Drive upload failed: {e}")
+
     return jsonify({"uploaded": len(results), "results": results}), 201
 
 
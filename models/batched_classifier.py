@@ -0,0 +1,81 @@
+# models/batched_classifier.py
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from models.classifier import (
+    load_rgb_image,
+    preprocess_image,
+    build_classification,
+    predict_batch,
+)
+
+# ---------------- Config ----------------
+MAX_BATCH = int(os.getenv("CLASSIFY_MAX_BATCH", 16))
+MAX_WAIT_MS = float(os.getenv("CLASSIFY_MAX_WAIT_MS", 10))
+
+_requests = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+# ---------------- Worker ----------------
+def _collect_batch():
+    """Block for the first item, then gather more until MAX_BATCH or MAX_WAIT_MS."""
+    batch = [_requests.get()]
+    # One deadline for the whole batch, so a steady trickle can't keep
+    # the first request waiting past MAX_WAIT_MS
+    end = time.monotonic() + MAX_WAIT_MS / 1000.0
+    while len(batch) < MAX_BATCH:
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_requests.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _run_worker():
+    while True:
+        batch = _collect_batch()
+        futures = [fut for _, fut in batch]
+        try:
+            inputs = np.stack([arr for arr, _ in batch])
+            idxs, confs = predict_batch(inputs)
+        except Exception as e:
+            for fut in futures:
+                fut.set_exception(e)
+            continue
+        for fut, class_idx, confidence in zip(futures, idxs.tolist(), confs.tolist()):
+            fut.set_result((class_idx, confidence))
+
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run_worker, name="classify-batcher", daemon=True)
+            _worker.start()
+
+
+# ---------------- Public API ----------------
+def classify_image_batched(image_path=None, image_bytes=None):
+    """
+    Same result as classifier.classify_image, but the forward pass is
+    shared with any other requests that arrive within MAX_WAIT_MS.
+    Library-only for now: it only pays off under a threaded server
+    (gunicorn --threads); /api/predict runs on sync workers and uses
+    classifier.predict_image_file.
+    """
+    _ensure_worker()
+    rgb = load_rgb_image(image_path, image_bytes)
+    fut = Future()
+    _requests.put((preprocess_image(rgb), fut))
+    class_idx, confidence = fut.result()
+    return build_classification(class_idx, confidence, rgb)
@@ -1,52 +1,185 @@
 # models/classifier.py
 import cv2
 import numpy as np
-from sklearn.cluster import KMeans
+import tensorflow as tf
 from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image as keras_image
-import os, json, requests
+import os, io, json, hashlib, requests, threading, shutil
+from collections import OrderedDict
+import h5py
+from PIL import Image
+
+try:
+    import onnxruntime as ort
+except ImportError:  # optional: fall back to the Keras model
+    ort = None
+
+try:
+    from tflite_runtime.interpreter import Interpreter as TFLiteInterpreter
+except ImportError:  # full TF ships the same interpreter
+    TFLiteInterpreter = tf.lite.Interpreter
+
+try:
+    from blake3 import blake3 as _content_hash
+except ImportError:  # stdlib fallback, still far cheaper than inference
+    _content_hash = hashlib.blake2b
+
+try:
+    from numba import njit
+except ImportError:  # optional: fall back to np.bincount
+    njit = None
 
 # ---------------- Paths ----------------
 MODEL_DIR = "models"
 MODEL_PATH = os.path.join(MODEL_DIR, "model.h5")
+ONNX_PATH = os.path.join(MODEL_DIR, "model.onnx")  # built by tools/export_onnx.py
+TFLITE_PATH = os.path.join(MODEL_DIR, "model.tflite")  # int8, built by tools/export_tflite.py
 CLASS_NAMES_PATH = os.path.join(MODEL_DIR, "class_names.json")
+IMG_SIZE = (96, 96)  # must match train.py
+
+# ---------------- Threading ----------------
+# Pin op thread pools so TF doesn't oversubscribe cores shared with gunicorn
+INTRA_OP_THREADS = int(os.getenv("INTRA_OP_THREADS", os.cpu_count() or 1))
+INTER_OP_THREADS = int(os.getenv("INTER_OP_THREADS", 2))
 
 # ---------------- Google Drive File IDs ----------------
 MODEL_FILE_ID = os.getenv("DRIVE_MODEL_ID", "")
 CLASS_FILE_ID = os.getenv("DRIVE_CLASSES_ID", "")
+MODEL_SHA256 = os.getenv("DRIVE_MODEL_SHA256", "")  # optional pin for the downloaded model
 
 # ---------------- Google Drive Downloader ----------------
-def download_file_from_google_drive(file_id, dest_path):
-    """Download a file from Google Drive by ID."""
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+_session = requests.Session()  # reused so repeated downloads keep the connection
+
+def _open_google_drive_download(file_id, what):
     if not file_id:
-        raise ValueError(f"Missing Google Drive file ID for {dest_path}")
+        raise ValueError(f"Missing Google Drive file ID for {what}")
     URL = "https://drive.google.com/uc?export=download"
-    session = requests.Session()
-    response = session.get(URL, params={"id": file_id}, stream=True)
+    # model.h5 doesn't compress, so skip gzip negotiation
+    headers = {"Accept-Encoding": "identity"}
+    response = _session.get(URL, params={"id": file_id}, headers=headers, stream=True)
     token = None
     for key, value in response.cookies.items():
         if key.startswith("download_warning"):
             token = value
     if token:
-        response = session.get(URL, params={"id": file_id, "confirm": token}, stream=True)
-    with open(dest_path, "wb") as f:
-        for chunk in response.iter_content(32768):
-            if chunk:
-                f.write(chunk)
+        response.close()
+        response = _session.get(URL, params={"id": file_id, "confirm": token}, headers=headers, stream=True)
+    response.raw.decode_content = True
+    return response
+
+def download_file_from_google_drive(file_id, dest_path):
+    """Download a file from Google Drive by ID."""
+    response = _open_google_drive_download(file_id, dest_path)
+    with response, open(dest_path, "wb") as f:
+        shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+
+def download_bytes_from_google_drive(file_id, sha256=None):
+    """
+    Download a file from Google Drive into memory (no disk round-trip).
+    If sha256 is given, a mismatch raises before anyone parses the bytes.
+    """
+    response = _open_google_drive_download(file_id, "in-memory download")
+    buf, digest = io.BytesIO(), hashlib.sha256()
+    with response:
+        while True:
+            chunk = response.raw.read(DOWNLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            buf.write(chunk)
+    if sha256 and digest.hexdigest() != sha256.lower():
+        raise ValueError(f"SHA-256 mismatch for Drive file {file_id}: got {digest.hexdigest()}")
+    buf.seek(0)
+    return buf
 
 # ---------------- Ensure Model Exists ----------------
 os.makedirs(MODEL_DIR, exist_ok=True)
 
-if not os.path.exists(MODEL_PATH):
-    print("Downloading model.h5 from Google Drive...")
-    download_file_from_google_drive(MODEL_FILE_ID, MODEL_PATH)
+# Backend preference: int8 TFLite > ONNX > Keras
+USE_TFLITE = os.path.exists(TFLITE_PATH)
+USE_ONNX = not USE_TFLITE and ort is not None and os.path.exists(ONNX_PATH)
 
 if not os.path.exists(CLASS_NAMES_PATH):
     print("Downloading class_names.json from Google Drive...")
     download_file_from_google_drive(CLASS_FILE_ID, CLASS_NAMES_PATH)
 
 # ---------------- Load Model & Classes ----------------
-clf_model = load_model(MODEL_PATH)
+tflite_interp = None
+ort_session = None
+clf_model = None
+
+if USE_TFLITE:
+    tflite_interp = TFLiteInterpreter(model_path=TFLITE_PATH, num_threads=INTRA_OP_THREADS)
+    tflite_interp.allocate_tensors()
+    _tflite_in = tflite_interp.get_input_details()[0]
+    _tflite_out = tflite_interp.get_output_details()[0]
+    _tflite_lock = threading.Lock()  # the interpreter is not thread-safe
+elif USE_ONNX:
+    _sess_options = ort.SessionOptions()
+    _sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    _sess_options.intra_op_num_threads = INTRA_OP_THREADS
+    _sess_options.inter_op_num_threads = INTER_OP_THREADS
+    ort_session = ort.InferenceSession(
+        ONNX_PATH, sess_options=_sess_options, providers=["CPUExecutionProvider"]
+    )
+    _ort_input = ort_session.get_inputs()[0].name
+else:
+    # Must run before the TF runtime initializes, i.e. before load_model
+    tf.config.threading.set_intra_op_parallelism_threads(INTRA_OP_THREADS)
+    tf.config.threading.set_inter_op_parallelism_threads(INTER_OP_THREADS)
+    tf.config.optimizer.set_jit(True)  # XLA-fuse the small conv net
+    if os.path.exists(MODEL_PATH):
+        clf_model = load_model(MODEL_PATH)
+    else:
+        # Cold start on an ephemeral container: load straight from memory
+        print("Downloading model.h5 from Google Drive...")
+        with h5py.File(download_bytes_from_google_drive(MODEL_FILE_ID, MODEL_SHA256), "r") as hf:
+            clf_model = load_model(hf)
+
+    @tf.function(input_signature=[tf.TensorSpec([None, IMG_SIZE[1], IMG_SIZE[0], 3], tf.float32)])
+    def predict_fn(x):
+        # Direct __call__ skips Model.predict's per-call batching/progbar overhead;
+        # top_k in-graph means only (index, confidence) per row leaves TF
+        probs = clf_model(x, training=False)
+        vals, idxs = tf.math.top_k(probs, k=1)
+        return idxs[:, 0], vals[:, 0]
+
+def _top1(probs):
+    idxs = probs.argmax(axis=1)
+    return idxs, probs[np.arange(len(idxs)), idxs]
+
+def _predict_tflite(inputs):
+    scale, zero_point = _tflite_in["quantization"]
+    if scale:
+        inputs = np.clip(np.round(inputs / scale + zero_point), 0, 255)
+    inputs = inputs.astype(_tflite_in["dtype"])
+    with _tflite_lock:
+        if tuple(_tflite_in["shape"]) != inputs.shape:
+            tflite_interp.resize_tensor_input(_tflite_in["index"], inputs.shape)
+            tflite_interp.allocate_tensors()
+            _tflite_in["shape"] = np.array(inputs.shape)
+        tflite_interp.set_tensor(_tflite_in["index"], inputs)
+        tflite_interp.invoke()
+        preds = tflite_interp.get_tensor(_tflite_out["index"])
+    out_scale, out_zero_point = _tflite_out["quantization"]
+    if out_scale:
+        preds = (preds.astype(np.float32) - out_zero_point) * out_scale
+    return preds
+
+def predict_batch(inputs):
+    """
+    Run a float32 (N, H, W, 3) batch through whichever backend is loaded.
+    Returns (class_indices, confidences), two length-N arrays.
+    """
+    if tflite_interp is not None:
+        return _top1(_predict_tflite(inputs))
+    if ort_session is not None:
+        return _top1(ort_session.run(None, {_ort_input: inputs})[0])
+    idxs, vals = predict_fn(tf.convert_to_tensor(inputs))
+    return idxs.numpy(), vals.numpy()
+
+# Warm up once at import so the first request doesn't pay for tracing
+predict_batch(np.zeros((1, IMG_SIZE[1], IMG_SIZE[0], 3), np.float32))
 
 if os.path.exists(CLASS_NAMES_PATH):
     with open(CLASS_NAMES_PATH, "r") as f:
@@ -54,26 +187,84 @@ if os.path.exists(CLASS_NAMES_PATH):
 else:
     class_names = None
 
+# ---------------- Image Decoding ----------------
+# Keras load_img (used by train.py) ignores EXIF orientation; so must we
+_IMREAD_FLAGS = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+
+
+def load_rgb_image(image_path=None, image_bytes=None):
+    """Decode an image once into an RGB uint8 array, from raw bytes or a path."""
+    if image_bytes is not None:
+        bgr = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), _IMREAD_FLAGS)
+    else:
+        bgr = cv2.imread(image_path, _IMREAD_FLAGS)
+    if bgr is not None:
+        return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+    # Formats OpenCV can't read (e.g. GIF): decode like load_img does
+    try:
+        src = io.BytesIO(image_bytes) if image_bytes is not None else image_path
+        with Image.open(src) as img:
+            return np.asarray(img.convert("RGB"))
+    except Exception:
+        raise ValueError(f"Could not decode image: {image_path or '<bytes>'}")
+
 # ---------------- Dominant Color ----------------
-def get_dominant_color(img_path, k=3):
-    img = cv2.imread(img_path)
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    img = img.reshape((-1, 3))
-    kmeans = KMeans(n_clusters=k, random_state=0).fit(img)
-    counts = np.bincount(kmeans.labels_)
-    dominant_color = kmeans.cluster_centers_[np.argmax(counts)]
-    return "#{:02x}{:02x}{:02x}".format(
-        int(dominant_color[0]), int(dominant_color[1]), int(dominant_color[2])
-    )
+def _color_histogram_np(small):
+    q = (small >> 4).astype(np.uint16)
+    idx = (q[..., 0] << 8) | (q[..., 1] << 4) | q[..., 2]
+    return np.bincount(idx.ravel(), minlength=4096)
+
+if njit is not None:
+    @njit(cache=True)
+    def _color_histogram(small):
+        # Pack + count in one native loop. Serial on purpose: a 64x64 input
+        # is too small for prange, and a shared histogram would race.
+        hist = np.zeros(4096, np.int64)
+        for y in range(small.shape[0]):
+            for x in range(small.shape[1]):
+                r = small[y, x, 0] >> 4
+                g = small[y, x, 1] >> 4
+                b = small[y, x, 2] >> 4
+                hist[(r << 8) | (g << 4) | b] += 1
+        return hist
+
+    # Compile (or load from cache) at import, not on the first request
+    _color_histogram(np.zeros((1, 1, 3), np.uint8))
+else:
+    _color_histogram = _color_histogram_np
+
+def get_dominant_color(rgb):
+    # Mode of a 16x16x16 RGB histogram over a 64x64 thumbnail: same visual
+    # result as clustering for a "dominant color", in one counting pass.
+    small = cv2.resize(rgb, (64, 64), interpolation=cv2.INTER_AREA)
+    top = int(_color_histogram(small).argmax())
+    r, g, b = ((top >> 8) & 0xF), ((top >> 4) & 0xF), (top & 0xF)
+    # report the bin midpoint
+    return "#{:02x}{:02x}{:02x}".format(r * 16 + 8, g * 16 + 8, b * 16 + 8)
 
 # ---------------- Classification ----------------
-def classify_image(image_path):
-    img = keras_image.load_img(image_path, target_size=(96, 96))
-    img_array = keras_image.img_to_array(img) / 255.0
-    img_array = np.expand_dims(img_array, axis=0)
-    preds = clf_model.predict(img_array)
-    class_idx = np.argmax(preds)
-    confidence = float(preds[0][class_idx])
+_buffers = threading.local()
+
+def _input_buffer():
+    """Per-thread (1, H, W, 3) float32 model input, reused across calls."""
+    buf = getattr(_buffers, "inp", None)
+    if buf is None:
+        buf = _buffers.inp = np.empty((1, IMG_SIZE[1], IMG_SIZE[0], 3), np.float32)
+    return buf
+
+def preprocess_image(rgb, out=None):
+    """Resize + normalize an RGB array into a single (H, W, 3) model input."""
+    resized = cv2.resize(rgb, IMG_SIZE, interpolation=cv2.INTER_AREA)
+    if out is None:
+        out = np.empty(resized.shape, np.float32)
+    # uint8 -> float32 scale in one pass, no intermediate arrays
+    np.multiply(resized, np.float32(1.0 / 255.0), out=out)
+    return out
+
+def build_classification(class_idx, confidence, rgb):
+    """Turn one top-1 prediction into the API result dict."""
+    class_idx, confidence = int(class_idx), float(confidence)
 
     if class_names:
         hierarchy = class_names[class_idx].split("_")
@@ -84,10 +275,45 @@ def classify_image(image_path):
         "label": hierarchy[-1],
         "hierarchy": hierarchy,
         "confidence": confidence,
-        "dominant_color": get_dominant_color(image_path),
+        "dominant_color": get_dominant_color(rgb),
     }
 
+def classify_image(image_path=None, image_bytes=None):
+    rgb = load_rgb_image(image_path, image_bytes)
+    img_array = _input_buffer()
+    preprocess_image(rgb, out=img_array[0])
+    idxs, confs = predict_batch(img_array)
+    return build_classification(idxs[0], confs[0], rgb)
+
+# ---------------- Result Cache ----------------
+# Retries and dashboards resubmit the same image; key results on content
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 10000))
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+def _cache_get(key):
+    with _result_cache_lock:
+        result = _result_cache.get(key)
+        if result is not None:
+            _result_cache.move_to_end(key)
+        return result
+
+def _cache_put(key, result):
+    with _result_cache_lock:
+        _result_cache[key] = result
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
 # ---------------- Single Image Prediction ----------------
-def predict_image_file(image_path):
-    classification = classify_image(image_path)
-    return {"objects": [classification]}
+def predict_image_file(image_path=None, image_bytes=None):
+    if image_bytes is None:
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+
+    key = _content_hash(image_bytes).hexdigest()
+    classification = _cache_get(key)
+    if classification is None:
+        classification = classify_image(image_path, image_bytes)
+        _cache_put(key, classification)
+    return {"objects": [dict(classification)]}
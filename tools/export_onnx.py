@@ -0,0 +1,31 @@
+# tools/export_onnx.py
+"""
+Export models/model.h5 to models/model.onnx.
+
+Run once after training (needs `pip install tf2onnx`):
+    python tools/export_onnx.py
+models/classifier.py picks up model.onnx automatically when onnxruntime
+is installed, and falls back to the Keras model otherwise.
+"""
+import os
+
+import tensorflow as tf
+import tf2onnx
+from tensorflow.keras.models import load_model
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+MODEL_PATH = os.path.join(ROOT, "models", "model.h5")
+ONNX_PATH = os.path.join(ROOT, "models", "model.onnx")
+IMG_SIZE = (96, 96)  # must match train.py
+
+
+def main():
+    model = load_model(MODEL_PATH)
+    spec = (tf.TensorSpec((None, IMG_SIZE[1], IMG_SIZE[0], 3), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=17, output_path=ONNX_PATH)
+    print(f"✅ ONNX model saved to {ONNX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
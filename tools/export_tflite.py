@@ -0,0 +1,54 @@
+# tools/export_tflite.py
+"""
+Export models/model.h5 to an int8-quantized models/model.tflite.
+
+Run once after training, with the training images in dataset/:
+    python tools/export_tflite.py
+Up to REP_SAMPLES images are used to calibrate the quantization ranges.
+models/classifier.py prefers model.tflite when it is present.
+"""
+import os
+import random
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+from tensorflow.keras.preprocessing.image import load_img, img_to_array
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+DATASET_DIR = os.path.join(ROOT, "dataset")
+MODEL_PATH = os.path.join(ROOT, "models", "model.h5")
+TFLITE_PATH = os.path.join(ROOT, "models", "model.tflite")
+IMG_SIZE = (96, 96)  # must match train.py
+REP_SAMPLES = 200
+
+
+def representative_dataset():
+    paths = [
+        os.path.join(root, f)
+        for root, _, files in os.walk(DATASET_DIR)
+        for f in files
+        if f.lower().endswith((".jpg", ".png", ".jpeg"))
+    ]
+    if not paths:
+        raise SystemExit("Dataset folder empty; need images to calibrate int8 ranges.")
+    random.seed(0)
+    for p in random.sample(paths, min(REP_SAMPLES, len(paths))):
+        arr = img_to_array(load_img(p, target_size=IMG_SIZE)) / 255.0
+        yield [np.expand_dims(arr, 0).astype(np.float32)]
+
+
+def main():
+    model = load_model(MODEL_PATH)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    with open(TFLITE_PATH, "wb") as f:
+        f.write(converter.convert())
+    print(f"✅ int8 TFLite model saved to {TFLITE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
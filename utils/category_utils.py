@@ -1,30 +1,65 @@
 import os
-import json
-from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from utils import drive_cache
+from utils.drive_util import (
+    FOLDER_MIME, LIST_PARAMS, get_service, list_all, resolve_dataset_path, run_batch,
+)
 
-load_dotenv()
+# Serve the tree from drive_cache for this long before rescanning Drive
+CATEGORY_REFRESH_SECONDS = int(os.getenv("CATEGORY_REFRESH_SECONDS", 300))
 
-# -------- Drive Setup --------
-SCOPES = ["https://www.googleapis.com/auth/drive.metadata.readonly"]
-SERVICE = None
-DRIVE_ROOT = os.getenv("DRIVE_FOLDER_ID", "root")  # shared drive root folder ID
 
-def get_service():
-    global SERVICE
-    if SERVICE is None:
-        service_account_info = json.loads(os.getenv("SERVICE_ACCOUNT_JSON"))
-        creds = service_account.Credentials.from_service_account_info(
-            service_account_info, scopes=SCOPES
-        )
-        SERVICE = build("drive", "v3", credentials=creds)
-    return SERVICE
+def _subfolder_query(folder_id):
+    return f"'{folder_id}' in parents and mimeType='{FOLDER_MIME}' and trashed=false"
+
+
+def _scan_level(service, frontier):
+    """
+    List the subfolders of every (folder_id, node) in frontier, attach them
+    to their node, and return the next level's frontier.
+    """
+    next_frontier = []
+
+    # A lone folder (e.g. the dataset root) is cheaper as a plain paged list
+    if len(frontier) == 1:
+        folder_id, node = frontier[0]
+        for f in list_all(service, q=_subfolder_query(folder_id), fields="files(id, name)"):
+            next_frontier.append((f["id"], node.setdefault(f["name"], {})))
+        return next_frontier
+
+    # Results are collected per folder and only read once the batch is done,
+    # so a retried batch (or sub-request) can't append a folder twice
+    results = run_batch(service, [
+        (str(i), service.files().list(
+            q=_subfolder_query(folder_id),
+            fields="nextPageToken, files(id, name)",
+            **LIST_PARAMS,
+        ))
+        for i, (folder_id, _) in enumerate(frontier)
+    ])
+    for i, (folder_id, node) in enumerate(frontier):
+        response, exception = results[str(i)]
+        if exception is not None:
+            raise exception
+        files = response.get("files", [])
+        # Rare: >1000 subfolders. Finish that folder with a paged list.
+        if response.get("nextPageToken"):
+            files += list_all(
+                service,
+                q=_subfolder_query(folder_id),
+                fields="files(id, name)",
+                page_token=response["nextPageToken"],
+            )
+        for f in files:
+            next_frontier.append((f["id"], node.setdefault(f["name"], {})))
+    return next_frontier
 
 
 def get_categories():
     """
     Fetch dataset folder structure (hierarchy) from Google Drive only.
+    The tree is walked breadth-first, one batched request per depth level,
+    and cached for CATEGORY_REFRESH_SECONDS (folder changes made through
+    drive_util invalidate it early).
     Example return:
     {
         "Plastic": {
@@ -35,38 +70,20 @@ def get_categories():
         "Metal": {}
     }
     """
-    service = get_service()
+    cached = drive_cache.get_tree(CATEGORY_REFRESH_SECONDS)
+    if cached is not None:
+        return cached
 
-    def scan_folder(folder_id):
-        result = {}
-        query = (
-            f"'{folder_id}' in parents and "
-            f"mimeType='application/vnd.google-apps.folder' and trashed=false"
-        )
-        folders = (
-            service.files()
-            .list(q=query, fields="files(id, name)")
-            .execute()
-            .get("files", [])
-        )
-        for f in folders:
-            result[f["name"]] = scan_folder(f["id"])
-        return result
-
-    # Look for "dataset" folder inside root
-    query = (
-        f"mimeType='application/vnd.google-apps.folder' and "
-        f"name='dataset' and '{DRIVE_ROOT}' in parents and trashed=false"
-    )
-    dataset_folders = (
-        service.files()
-        .list(q=query, fields="files(id, name)")
-        .execute()
-        .get("files", [])
-    )
+    service = get_service()
 
-    if not dataset_folders:
+    try:
+        dataset_id, _ = resolve_dataset_path("dataset")
+    except FileNotFoundError:
         return {}
 
-    dataset_id = dataset_folders[0]["id"]
-    return scan_folder(dataset_id)
+    tree = {}
+    frontier = [(dataset_id, tree)]
+    while frontier:
+        frontier = _scan_level(service, frontier)
+    drive_cache.put_tree(tree)
+    return tree
@@ -0,0 +1,99 @@
+# backend/utils/drive_cache.py
+"""
+On-disk (SQLite) cache of Drive folder ids and the category tree, so a
+restarted process can skip the folder-by-folder lookups entirely.
+Point DRIVE_CACHE_PATH at a persistent volume in production.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+CACHE_PATH = os.getenv(
+    "DRIVE_CACHE_PATH", os.path.join(os.path.dirname(__file__), "..", "drive_cache.sqlite")
+)
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+@contextmanager
+def _connect():
+    """Short-lived connection: commits on success, always closes."""
+    global _initialized
+    conn = sqlite3.connect(CACHE_PATH, timeout=10)
+    if not _initialized:
+        with _init_lock:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS children (
+                    parent_id TEXT, name TEXT, child_id TEXT, mime TEXT,
+                    PRIMARY KEY (parent_id, name)
+                );
+                CREATE TABLE IF NOT EXISTS tree (
+                    id INTEGER PRIMARY KEY CHECK (id = 1), data TEXT, updated_at REAL
+                );
+                """
+            )
+            _initialized = True
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+# -------- Folder ids --------
+def get_child(parent_id, name):
+    """Cached child id for (parent_id, name), or None."""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT child_id FROM children WHERE parent_id = ? AND name = ?", (parent_id, name)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def put_children(parent_id, items):
+    """
+    Store a listing of {id, name, mimeType} items under parent_id. The
+    first of two same-named siblings wins, as it does in get_folder_id.
+    """
+    rows = [(parent_id, x["name"], x["id"], x.get("mimeType")) for x in items]
+    with _connect() as conn:
+        conn.executemany("INSERT OR IGNORE INTO children VALUES (?, ?, ?, ?)", rows)
+
+
+def delete_child(parent_id, name):
+    with _connect() as conn:
+        conn.execute("DELETE FROM children WHERE parent_id = ? AND name = ?", (parent_id, name))
+
+
+def clear():
+    """Drop everything (e.g. after Drive rejects a cached id)."""
+    with _connect() as conn:
+        conn.execute("DELETE FROM children")
+        conn.execute("DELETE FROM tree")
+
+
+# -------- Category tree --------
+def get_tree(max_age):
+    """Cached category tree if younger than max_age seconds, else None."""
+    with _connect() as conn:
+        row = conn.execute("SELECT data, updated_at FROM tree WHERE id = 1").fetchone()
+    if row and time.time() - row[1] < max_age:
+        return json.loads(row[0])
+    return None
+
+
+def put_tree(tree):
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO tree VALUES (1, ?, ?)", (json.dumps(tree), time.time())
+        )
+
+
+def invalidate_tree():
+    with _connect() as conn:
+        conn.execute("DELETE FROM tree")
@@ -3,48 +3,284 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
-import io
 import json
+import logging
+import mimetypes
+import time
+import random
+import tarfile
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import google_auth_httplib2
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload, MediaFileUpload, build_http
+from utils import drive_cache
+from utils.io_utils import BackgroundWriter, BufferedPrefetchStream
 
 # -------- Setup --------
+# Callers (app.py) attach handlers; print() would serialize the worker pools on stdout
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
 SCOPES = ["https://www.googleapis.com/auth/drive"]
-SERVICE = None
+CREDS = None
+_DISCOVERY_DOC = None
+
+DOWNLOAD_CHUNK_SIZE = 16 * 1024 * 1024  # default 100KB means thousands of round-trips for big files
+DOWNLOAD_WORKERS = int(os.getenv("DRIVE_DL_CONCURRENCY", 8))
+UPLOAD_WORKERS = 8
+SIMPLE_UPLOAD_MAX = 5 * 1024 * 1024  # below this, one multipart POST beats a resumable session
+UPLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+RETRYABLE_STATUSES = (429, 500, 503)
+RATE_LIMIT_REASONS = ("userRateLimitExceeded", "rateLimitExceeded")  # sent as 403
+MAX_ATTEMPTS = 5
+BATCH_LIMIT = 100  # max sub-requests per Drive BatchHttpRequest
+GENERATE_IDS_LIMIT = 1000  # max ids per files().generateIds call
 
 # Root folder (TrashAI-Dataset folder ID from .env)
 DRIVE_ROOT = os.getenv("DRIVE_FOLDER_ID", "root")
 
+FOLDER_MIME = "application/vnd.google-apps.folder"
+
+# -------- Folder ID Cache --------
+# (parent_id, name) -> folder id. Folder ids are stable, so a hit saves a
+# files().list round-trip per path segment. Backed by drive_cache (SQLite)
+# so the map survives restarts.
+_FOLDER_ID_CACHE = {}
+# (start_parent_id, normalized path) -> folder id, skips the per-segment walk
+_PATH_CACHE = {}
+_DATASET_ID = None
+_cache_lock = threading.Lock()
+_dataset_lock = threading.Lock()
+
+
+def _cache_folders(parent_id, folders):
+    if not folders:
+        return
+    # First one wins for same-named siblings, matching get_folder_id's pick
+    with _cache_lock:
+        for f in folders:
+            _FOLDER_ID_CACHE.setdefault((parent_id, f["name"]), f["id"])
+    drive_cache.put_children(parent_id, folders)
+
+
+def _cached_folder_id(parent_id, name):
+    folder_id = _FOLDER_ID_CACHE.get((parent_id, name))
+    if folder_id is None:
+        folder_id = drive_cache.get_child(parent_id, name)
+        if folder_id is not None:
+            with _cache_lock:
+                _FOLDER_ID_CACHE[(parent_id, name)] = folder_id
+    return folder_id
+
+
+def invalidate_folder_cache(parent_id, name):
+    """Forget a cached (parent, name) entry after it was moved/deleted."""
+    global _DATASET_ID
+    with _cache_lock:
+        folder_id = _FOLDER_ID_CACHE.pop((parent_id, name), None)
+        if folder_id is not None and folder_id == _DATASET_ID:
+            _DATASET_ID = None
+        # Any cached path may run through the removed folder
+        _PATH_CACHE.clear()
+    drive_cache.delete_child(parent_id, name)
+    drive_cache.invalidate_tree()
+
+
+def clear_folder_cache():
+    """Drop every cached id, e.g. when Drive rejects one as stale."""
+    global _DATASET_ID
+    with _cache_lock:
+        _FOLDER_ID_CACHE.clear()
+        _PATH_CACHE.clear()
+        _DATASET_ID = None
+    drive_cache.clear()
+
+
+_setup_lock = threading.Lock()
+_thread_state = threading.local()
+
+
+def _get_credentials():
+    """Parse the service account and the bundled Drive discovery doc once per process."""
+    global CREDS, _DISCOVERY_DOC
+    with _setup_lock:
+        if CREDS is None:
+            service_account_info = json.loads(os.getenv("SERVICE_ACCOUNT_JSON"))
+            CREDS = service_account.Credentials.from_service_account_info(
+                service_account_info, scopes=SCOPES
+            )
+            _DISCOVERY_DOC = json.loads(get_static_doc("drive", "v3"))
+    return CREDS
+
 
 def get_service():
-    """Build Google Drive API service (cached)."""
-    global SERVICE
-    if SERVICE is None:
-        service_account_info = json.loads(os.getenv("SERVICE_ACCOUNT_JSON"))
-        creds = service_account.Credentials.from_service_account_info(
-            service_account_info, scopes=SCOPES
-        )
-        SERVICE = build("drive", "v3", credentials=creds)
-    return SERVICE
+    """
+    Build Google Drive API service (cached per thread).
+    httplib2.Http is not thread-safe, so each thread (gunicorn worker
+    threads, upload/download pools) keeps its own keep-alive connection;
+    credentials and the discovery doc are shared. build_http() keeps the
+    client's socket timeout and stops treating Drive's resumable-upload
+    308 as a redirect.
+    """
+    service = getattr(_thread_state, "service", None)
+    if service is None:
+        http = google_auth_httplib2.AuthorizedHttp(_get_credentials(), http=build_http())
+        service = _thread_state.service = build_from_document(_DISCOVERY_DOC, http=http)
+    return service
 
 
 # -------- Helpers --------
+def _is_retryable(error):
+    status = error.resp.status
+    if status in RETRYABLE_STATUSES:
+        return True
+    if status == 403:
+        details = error.error_details if isinstance(error.error_details, list) else []
+        return any(isinstance(d, dict) and d.get("reason") in RATE_LIMIT_REASONS for d in details)
+    return False
+
+
+def execute_with_retry(request, max_attempts=MAX_ATTEMPTS):
+    """request.execute(), retrying rate-limit/5xx errors with jittered 2^n backoff."""
+    for attempt in range(max_attempts):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if not _is_retryable(e) or attempt == max_attempts - 1:
+                raise
+            time.sleep(2 ** attempt + random.random())
+
+
+def _q(value):
+    """Escape a value for use inside a single-quoted Drive query string."""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+# Shared-drive aware listing; 1000 is the API max page size (default is 100)
+LIST_PARAMS = {
+    "pageSize": 1000,
+    "supportsAllDrives": True,
+    "includeItemsFromAllDrives": True,
+    "corpora": "allDrives",
+}
+
+
+def list_all(service, fields="files(id, name, mimeType)", page_token=None, **params):
+    """Run a files().list query, following nextPageToken until exhausted."""
+    if "nextPageToken" not in fields:
+        fields = f"nextPageToken, {fields}"
+    items = []
+    while True:
+        results = execute_with_retry(service.files().list(
+            fields=fields, pageToken=page_token, **LIST_PARAMS, **params
+        ))
+        items.extend(results.get("files", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            break
+    return items
+
+
+def find_first(service, q, fields="id"):
+    """First file matching q (or None), as a single pageSize=1 request."""
+    results = execute_with_retry(service.files().list(
+        q=q, fields=f"files({fields})", **{**LIST_PARAMS, "pageSize": 1}
+    ))
+    files = results.get("files", [])
+    return files[0] if files else None
+
+
+def run_batch(service, requests):
+    """
+    Execute [(key, request), ...] as BatchHttpRequests of up to BATCH_LIMIT
+    sub-requests (metadata calls only; Drive doesn't batch media).
+    Sub-requests that fail with a rate-limit/5xx error are resubmitted in
+    a follow-up batch with the same jittered backoff as execute_with_retry.
+    Returns {key: (response, exception)}.
+    """
+    results = {}
+
+    def collect(request_id, response, exception):
+        results[request_id] = (response, exception)
+
+    pending = list(requests)
+    for attempt in range(MAX_ATTEMPTS):
+        for start in range(0, len(pending), BATCH_LIMIT):
+            batch = service.new_batch_http_request(callback=collect)
+            for key, request in pending[start:start + BATCH_LIMIT]:
+                batch.add(request, request_id=key)
+            execute_with_retry(batch)
+
+        pending = [
+            (key, request) for key, request in pending
+            if isinstance(results[key][1], HttpError) and _is_retryable(results[key][1])
+        ]
+        if not pending or attempt == MAX_ATTEMPTS - 1:
+            break
+        time.sleep(2 ** attempt + random.random())
+    return results
+
+
 def list_drive_items(parent_id):
     """List all children of a folder (with pagination)."""
+    return list_all(get_service(), q=f"'{parent_id}' in parents and trashed=false")
+
+
+def list_subfolders(parent_id):
+    """List only the child folders, so image-heavy folders don't page through files."""
+    return list_all(
+        get_service(),
+        q=f"'{parent_id}' in parents and mimeType='{FOLDER_MIME}' and trashed=false",
+    )
+
+
+def _prefetch_folder_chain(parent_id, parts):
+    """
+    Resolve as much of parent_id/parts as possible with ONE query for every
+    folder named in parts, stitching the chain together client-side.
+    Returns the (parent, name) key of the first missing segment, or None.
+    Ambiguous keys (two folders with the same name under one parent) are
+    left uncached so get_folder_id falls back to listing that parent.
+    Drive may answer an allDrives search incompletely; a segment missing
+    from such a reply is not proof of absence, so None is returned.
+    """
     service = get_service()
-    items, page_token = [], None
+    names = " or ".join(f"name='{_q(p)}'" for p in set(parts))
+    folders, page_token, complete = [], None, True
     while True:
-        results = service.files().list(
-            q=f"'{parent_id}' in parents and trashed=false",
-            fields="nextPageToken, files(id, name, mimeType)",
+        results = execute_with_retry(service.files().list(
+            q=f"mimeType='{FOLDER_MIME}' and trashed=false and ({names})",
+            fields="nextPageToken, incompleteSearch, files(id, name, parents)",
             pageToken=page_token,
-        ).execute()
-        items.extend(results.get("files", []))
+            **LIST_PARAMS,
+        ))
+        folders.extend(results.get("files", []))
+        complete = complete and not results.get("incompleteSearch", False)
         page_token = results.get("nextPageToken")
         if not page_token:
             break
-    return items
+
+    by_key = {}
+    for f in folders:
+        for parent in f.get("parents", []):
+            by_key.setdefault((parent, f["name"]), []).append(f)
+
+    current = parent_id
+    for part in parts:
+        matches = by_key.get((current, part))
+        if not matches:
+            return (current, part) if complete else None
+        if len(matches) > 1:
+            return None
+        _cache_folders(current, matches)
+        current = matches[0]["id"]
+    return None
 
 
 def get_folder_id(path, parent_id=None, create=False):
@@ -62,29 +298,63 @@ def get_folder_id(path, parent_id=None, create=False):
     if len(path) > 20 and "/" not in path and "\\" not in path:
         return path
 
-    parts = path.strip("/").split("/")
+    start_parent = current_parent
+    path_key = (start_parent, path.strip("/"))
+    cached_path = _PATH_CACHE.get(path_key)
+    if cached_path:
+        return cached_path
+
+    parts = path_key[1].split("/")
+
+    # Two or more uncached segments: fetch them all in one query up front
+    known_missing = None
+    walk = current_parent
+    for i, part in enumerate(parts):
+        child = _cached_folder_id(walk, part)
+        if child is None:
+            if len(parts) - i > 1:
+                known_missing = _prefetch_folder_chain(walk, parts[i:])
+            break
+        walk = child
+
+    parent_is_new = False
     for part in parts:
-        items = list_drive_items(current_parent)
-        match = next(
-            (x for x in items if x["name"] == part and x["mimeType"] == "application/vnd.google-apps.folder"),
-            None,
-        )
+        cached = _cached_folder_id(current_parent, part)
+        if cached:
+            current_parent = cached
+            continue
+
+        if create and (parent_is_new or known_missing == (current_parent, part)):
+            # Prefetch proved it's absent, or the parent was just created
+            items = []
+        else:
+            items = list_subfolders(current_parent)
+        # Cache every sibling folder we just paid to list
+        _cache_folders(current_parent, items)
+        match = next((x for x in items if x["name"] == part), None)
 
         if match:
             current_parent = match["id"]
         elif create:
             folder_metadata = {
                 "name": part,
-                "mimeType": "application/vnd.google-apps.folder",
+                "mimeType": FOLDER_MIME,
                 "parents": [current_parent],
             }
-            folder = service.files().create(body=folder_metadata, fields="id").execute()
+            folder = execute_with_retry(
+                service.files().create(body=folder_metadata, fields="id", supportsAllDrives=True)
+            )
+            _cache_folders(current_parent, [{"id": folder["id"], "name": part, "mimeType": FOLDER_MIME}])
+            drive_cache.invalidate_tree()
             current_parent = folder["id"]
-            print(f"📂 Created folder '{part}'")
+            parent_is_new = True
+            logger.info("📂 Created folder '%s'", part)
         else:
-            print("📂 Available folders here:", [i["name"] for i in items])
+            logger.info("📂 Available folders here: %s", [i["name"] for i in items])
             raise FileNotFoundError(f"Folder '{part}' not found in Drive path: {path}")
 
+    with _cache_lock:
+        _PATH_CACHE[path_key] = current_parent
     return current_parent
 
 
@@ -97,15 +367,75 @@ def resolve_dataset_path(drive_path, create=False):
     if not drive_path.startswith("dataset"):
         raise ValueError("All dataset paths must start with 'dataset/'")
 
+    global _DATASET_ID
     rel_path = drive_path[len("dataset/"):].strip("/")
-    dataset_folder_id = get_folder_id("dataset", parent_id=DRIVE_ROOT, create=create)
-    return dataset_folder_id, rel_path
+    dataset_id = _DATASET_ID
+    if dataset_id is None:
+        # Locked so concurrent first uploads can't each create a "dataset" folder
+        with _dataset_lock:
+            if _DATASET_ID is None:
+                _DATASET_ID = get_folder_id("dataset", parent_id=DRIVE_ROOT, create=create)
+            dataset_id = _DATASET_ID
+    return dataset_id, rel_path
 
 
 # -------- Download --------
+def _download_file(file_id, dest):
+    """Stream one Drive file to dest in DOWNLOAD_CHUNK_SIZE chunks."""
+    request = get_service().files().get_media(fileId=file_id, supportsAllDrives=True)
+    # Disk writes happen on a background thread while the next chunk downloads
+    with BackgroundWriter(dest) as fh:
+        downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+        done = False
+        while not done:
+            status, done = downloader.next_chunk(num_retries=MAX_ATTEMPTS)
+
+
+PARENTS_PER_QUERY = 50  # folders whose children are listed in one query
+
+
+def _collect_folder_files(drive_path, folder_id, local_path):
+    """
+    Walk a Drive folder tree breadth-first, returning [(file_id, drive_path, dest)]
+    for every file. Children of up to PARENTS_PER_QUERY folders are fetched
+    with one ('a' in parents or 'b' in parents ...) query, so an N-folder
+    tree costs about N / PARENTS_PER_QUERY listings instead of N.
+    """
+    service = get_service()
+    jobs = []
+    frontier = {folder_id: (drive_path, local_path)}
+    while frontier:
+        next_frontier = {}
+        parent_ids = list(frontier)
+        for start in range(0, len(parent_ids), PARENTS_PER_QUERY):
+            chunk = parent_ids[start:start + PARENTS_PER_QUERY]
+            parents_q = " or ".join(f"'{pid}' in parents" for pid in chunk)
+            items = list_all(
+                service,
+                q=f"trashed=false and ({parents_q})",
+                fields="files(id, name, mimeType, parents)",
+            )
+            for item in items:
+                parent = next((p for p in item.get("parents", []) if p in frontier), None)
+                if parent is None:
+                    continue
+                parent_drive_path, parent_local = frontier[parent]
+                item_drive_path = f"{parent_drive_path}/{item['name']}"
+                dest = os.path.join(parent_local, item["name"])
+                if item["mimeType"] == FOLDER_MIME:
+                    os.makedirs(dest, exist_ok=True)
+                    next_frontier[item["id"]] = (item_drive_path, dest)
+                else:
+                    jobs.append((item["id"], item_drive_path, dest))
+        frontier = next_frontier
+    return jobs
+
+
 def download_from_drive(drive_path, local_path):
     """
     Downloads a file/folder from Google Drive.
+    For folders, the whole tree is listed first and every file is then
+    fetched on a DOWNLOAD_WORKERS-sized thread pool.
     """
     service = get_service()
 
@@ -114,70 +444,284 @@ def download_from_drive(drive_path, local_path):
         folder_id = get_folder_id(drive_path)
         os.makedirs(local_path, exist_ok=True)
 
-        items = list_drive_items(folder_id)
-        for item in items:
-            file_id, name, mime = item["id"], item["name"], item["mimeType"]
-            dest = os.path.join(local_path, name)
-
-            if mime == "application/vnd.google-apps.folder":
-                download_from_drive(f"{drive_path}/{name}", dest)
-            else:
-                request = service.files().get_media(fileId=file_id)
-                with io.FileIO(dest, "wb") as fh:
-                    downloader = MediaIoBaseDownload(fh, request)
-                    done = False
-                    while not done:
-                        status, done = downloader.next_chunk()
-                print(f"⬇️ Downloaded {drive_path}/{name} -> {dest}")
+        jobs = _collect_folder_files(drive_path, folder_id, local_path)
+
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+            futures = {
+                pool.submit(_download_file, file_id, dest): (item_drive_path, dest)
+                for file_id, item_drive_path, dest in jobs
+            }
+            for future in as_completed(futures):
+                item_drive_path, dest = futures[future]
+                future.result()  # re-raise the first failed download
+                logger.info("⬇️ Downloaded %s -> %s", item_drive_path, dest)
     else:
         # File case
         folder_path, filename = os.path.split(drive_path)
         folder_id = get_folder_id(folder_path) if folder_path else DRIVE_ROOT
 
-        query = f"name='{filename}' and '{folder_id}' in parents and trashed=false"
-        results = service.files().list(q=query, fields="files(id)").execute()
-        files = results.get("files", [])
+        query = f"name='{_q(filename)}' and '{folder_id}' in parents and trashed=false"
+        match = find_first(service, query)
 
-        if not files:
-            print(f"⚠️ {drive_path} not found in Drive")
+        if not match:
+            logger.warning("⚠️ %s not found in Drive", drive_path)
             return
 
-        file_id = files[0]["id"]
+        file_id = match["id"]
         os.makedirs(os.path.dirname(local_path), exist_ok=True)
 
-        request = service.files().get_media(fileId=file_id)
-        with io.FileIO(local_path, "wb") as fh:
-            downloader = MediaIoBaseDownload(fh, request)
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-        print(f"⬇️ Downloaded {drive_path} -> {local_path}")
+        _download_file(file_id, local_path)
+        logger.info("⬇️ Downloaded %s -> %s", drive_path, local_path)
 
 
 # -------- Upload --------
+def _resolve_upload_folder(drive_folder):
+    """dataset/<...> folder path -> folder id, creating folders if missing."""
+    dataset_folder_id, rel_folder = resolve_dataset_path(drive_folder, create=True)
+    return get_folder_id(rel_folder, parent_id=dataset_folder_id, create=True)
+
+
+def _generate_ids(service, count):
+    """Pre-allocate count Drive file ids."""
+    ids = []
+    while len(ids) < count:
+        n = min(count - len(ids), GENERATE_IDS_LIMIT)
+        ids.extend(execute_with_retry(service.files().generateIds(count=n, space="drive"))["ids"])
+    return ids
+
+
+def _create_file(local_path, parent_id, filename, file_id=None):
+    """
+    Create a new Drive file; there is no create-vs-update lookup first.
+    Files under SIMPLE_UPLOAD_MAX go up as one multipart POST, larger ones
+    through a resumable session. file_id, if given, comes from generateIds.
+    """
+    file_metadata = {"name": filename, "parents": [parent_id]}
+    if file_id:
+        file_metadata["id"] = file_id
+    if os.path.getsize(local_path) < SIMPLE_UPLOAD_MAX:
+        media = MediaFileUpload(local_path, resumable=False)
+        stream = None
+    else:
+        # Read the next chunk from disk while the current one is on the wire
+        stream = BufferedPrefetchStream(local_path)
+        mimetype = mimetypes.guess_type(local_path)[0] or "application/octet-stream"
+        media = MediaIoBaseUpload(stream, mimetype, chunksize=UPLOAD_CHUNK_SIZE, resumable=True)
+    request = get_service().files().create(
+        body=file_metadata, media_body=media, fields="id", supportsAllDrives=True
+    )
+    try:
+        return execute_with_retry(request)["id"]
+    except HttpError as e:
+        # A retried create whose first attempt landed: the id is already ours
+        if file_id and e.resp.status == 409:
+            return file_id
+        raise
+    finally:
+        if stream is not None:
+            stream.close()
+
+
+def _upload(local_path, folder_id, filename, reresolve=None, file_id=None):
+    """
+    Upload into an already-resolved folder id (no path walk). A 404 means
+    the cached folder id went stale: caches are dropped and, if given,
+    reresolve(stale_id) supplies a fresh id for one more try.
+    """
+    try:
+        return _create_file(local_path, folder_id, filename, file_id)
+    except HttpError as e:
+        if e.resp.status != 404 or reresolve is None:
+            raise
+        logger.warning("⚠️ Cached Drive folder id is stale, re-resolving")
+        clear_folder_cache()
+        return _create_file(local_path, reresolve(folder_id), filename, file_id)
+
+
 def upload_to_drive(local_path, drive_path):
     """
     Upload a local file into Google Drive dataset folder.
     Creates intermediate folders if missing.
     """
-    service = get_service()
-    dataset_folder_id, rel_path = resolve_dataset_path(drive_path, create=True)
+    folder, filename = os.path.split(drive_path)
+    file_id = _upload(
+        local_path, _resolve_upload_folder(folder), filename,
+        reresolve=lambda _: _resolve_upload_folder(folder),
+    )
+    logger.info("⬆️ Uploaded %s -> %s (id=%s)", local_path, drive_path, file_id)
+    return file_id
 
-    folder_path, filename = os.path.split(rel_path)
-    parent_id = get_folder_id(folder_path, parent_id=dataset_folder_id, create=True)
 
-    file_metadata = {"name": filename, "parents": [parent_id]}
-    media = MediaFileUpload(local_path, resumable=True)
+class _DriveBatch:
+    """Uploads into one dataset folder whose id is resolved once."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix.strip("/")
+        self.folder_id = _resolve_upload_folder(self.prefix)
+
+    def _reresolve(self, _stale_id):
+        self.folder_id = _resolve_upload_folder(self.prefix)
+        return self.folder_id
+
+    def upload(self, local_path, filename):
+        file_id = _upload(local_path, self.folder_id, filename, reresolve=self._reresolve)
+        logger.info("⬆️ Uploaded %s -> %s/%s (id=%s)", local_path, self.prefix, filename, file_id)
+        return file_id
+
+
+@contextmanager
+def drive_batch(prefix):
+    """
+    Resolve (and create) the dataset folder `prefix` once for many uploads:
+        with drive_batch("dataset/Metal/Zinc") as b:
+            b.upload(local1, "a.jpg")
+            b.upload(local2, "b.jpg")
+    """
+    yield _DriveBatch(prefix)
+
+
+_upload_pool = None
+_upload_pool_lock = threading.Lock()
+
 
-    file = service.files().create(
-        body=file_metadata, media_body=media, fields="id"
-    ).execute()
+def _get_upload_pool():
+    """One long-lived pool, so its threads keep their Drive connections across requests."""
+    global _upload_pool
+    with _upload_pool_lock:
+        if _upload_pool is None:
+            _upload_pool = ThreadPoolExecutor(
+                max_workers=UPLOAD_WORKERS, thread_name_prefix="drive-upload"
+            )
+    return _upload_pool
 
-    print(f"⬆️ Uploaded {local_path} -> {drive_path} (id={file['id']})")
-    return file["id"]
+
+def upload_many(pairs):
+    """
+    Upload [(local_path, drive_path), ...] concurrently on a shared pool
+    of UPLOAD_WORKERS threads; a single file is uploaded inline on the
+    calling thread, reusing its Drive connection.
+    Target folders are resolved (and created) once, up front and serially,
+    so workers never race to create the same folder. If one went stale,
+    the first worker to hit the 404 re-resolves it for the rest.
+    Rate-limit and 5xx errors are retried with exponential backoff (see
+    execute_with_retry).
+    For two or more files, ids are pre-allocated with one generateIds call,
+    so a retried create is idempotent (409 means the first attempt already
+    landed); a single file skips that extra round-trip.
+    Returns the new file ids in the same order as pairs (None on failure).
+    """
+    if not pairs:
+        return []
+
+    targets = {}
+    for _, drive_path in pairs:
+        folder = os.path.dirname(drive_path)
+        if folder not in targets:
+            targets[folder] = _resolve_upload_folder(folder)
+    file_ids = _generate_ids(get_service(), len(pairs)) if len(pairs) > 1 else [None]
+    refresh_lock = threading.Lock()
+
+    def upload_one(local_path, drive_path, file_id):
+        folder, filename = os.path.split(drive_path)
+
+        def reresolve(stale_id):
+            with refresh_lock:
+                if targets[folder] == stale_id:
+                    targets[folder] = _resolve_upload_folder(folder)
+                return targets[folder]
+
+        return _upload(local_path, targets[folder], filename, reresolve=reresolve, file_id=file_id)
+
+    results = [None] * len(pairs)
+
+    def run(i):
+        local_path, drive_path = pairs[i]
+        try:
+            results[i] = upload_one(local_path, drive_path, file_ids[i])
+            logger.info("⬆️ Uploaded %s -> %s (id=%s)", local_path, drive_path, results[i])
+        except Exception as e:
+            logger.warning("⚠️ Drive upload failed for %s: %s", drive_path, e)
+
+    if len(pairs) == 1:
+        run(0)
+    else:
+        list(_get_upload_pool().map(run, range(len(pairs))))
+    return results
+
+
+def upload_bundle(local_dir, drive_subpath, compress=True):
+    """
+    Pack local_dir into one tar (gzipped if compress) and upload it as
+    drive_subpath + ".tar.gz" / ".tar". Many small files cost one upload
+    instead of one per file, but the bundle is opaque on Drive: single
+    files can't be listed, moved or fetched without downloading it all.
+    Returns the new file id.
+    """
+    suffix = ".tar.gz" if compress else ".tar"
+    tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    try:
+        with tarfile.open(fileobj=tmp, mode="w:gz" if compress else "w") as tar:
+            tar.add(local_dir, arcname=os.path.basename(os.path.normpath(local_dir)))
+        tmp.close()
+        return upload_to_drive(tmp.name, drive_subpath + suffix)
+    finally:
+        tmp.close()
+        os.remove(tmp.name)
 
 
 # -------- Delete --------
+def _folder_is_stale(service, folder_id):
+    """True if a (cached) folder id no longer points at a live folder."""
+    try:
+        meta = execute_with_retry(service.files().get(
+            fileId=folder_id, fields="trashed", supportsAllDrives=True
+        ))
+    except HttpError as e:
+        if e.resp.status == 404:
+            return True
+        raise
+    return meta.get("trashed", False)
+
+
+def _deepest_cached_folder(root_id, path):
+    """Id of the deepest folder along root_id/path known to the cache (no API calls)."""
+    folder_id = root_id
+    for part in filter(None, path.split("/")):
+        child = _cached_folder_id(folder_id, part)
+        if child is None:
+            break
+        folder_id = child
+    return folder_id
+
+
+def _find_in_folder(service, dataset_id, parent_path, name, fields):
+    """
+    Items called name directly under dataset/parent_path, and the parent's
+    id. Cached folder ids are revalidated lazily: if the walk or the lookup
+    comes up empty and the deepest cached folder on the path is gone, the
+    caches are dropped and the walk is retried once.
+    """
+    for attempt in range(2):
+        missing = None
+        try:
+            parent_id = get_folder_id(parent_path, parent_id=dataset_id)
+            query = f"name='{_q(name)}' and '{parent_id}' in parents and trashed=false"
+            files = list_all(service, q=query, fields=f"files({fields})")
+            if files:
+                return files, parent_id
+        except FileNotFoundError as e:
+            missing = e
+
+        # A genuinely absent item: the cache is fine, keep it
+        if attempt or not _folder_is_stale(service, _deepest_cached_folder(dataset_id, parent_path)):
+            if missing is not None:
+                raise missing
+            return [], parent_id
+        logger.warning("⚠️ Cached Drive folder ids are stale, re-resolving")
+        clear_folder_cache()
+        dataset_id, _ = resolve_dataset_path("dataset")
+
+
 def delete_from_drive(drive_path):
     """
     Delete a file or folder from dataset.
@@ -187,26 +731,81 @@ def delete_from_drive(drive_path):
     dataset_folder_id, rel_path = resolve_dataset_path(drive_path)
 
     if not rel_path:
-        print("⚠️ Refusing to delete root dataset folder.")
+        logger.warning("⚠️ Refusing to delete root dataset folder.")
         return
 
     parent_path, target_name = os.path.split(rel_path)
-    parent_id = get_folder_id(parent_path, parent_id=dataset_folder_id, create=False)
-
-    query = f"name='{target_name}' and '{parent_id}' in parents and trashed=false"
-    results = service.files().list(q=query, fields="files(id, mimeType)").execute()
-    files = results.get("files", [])
+    files, parent_id = _find_in_folder(
+        service, dataset_folder_id, parent_path, target_name, "id, mimeType"
+    )
 
     if not files:
-        print(f"⚠️ Drive delete failed: {drive_path} not found")
+        logger.warning("⚠️ Drive delete failed: %s not found", drive_path)
         return
 
     for file in files:
         try:
-            service.files().delete(fileId=file["id"]).execute()
-            print(f"🗑️ Deleted {drive_path} ({file['mimeType']})")
+            execute_with_retry(service.files().delete(fileId=file["id"], supportsAllDrives=True))
+            if file["mimeType"] == FOLDER_MIME:
+                invalidate_folder_cache(parent_id, target_name)
+            logger.info("🗑️ Deleted %s (%s)", drive_path, file["mimeType"])
         except Exception as e:
-            print(f"⚠️ Failed to delete {drive_path}: {e}")
+            logger.warning("⚠️ Failed to delete %s: %s", drive_path, e)
+
+
+def _lookup_request(service, parent_id, name, fields):
+    query = f"name='{_q(name)}' and '{parent_id}' in parents and trashed=false"
+    return service.files().list(q=query, fields=f"files({fields})", **LIST_PARAMS)
+
+
+def delete_many(drive_paths):
+    """
+    Delete many dataset files/folders. Folder ids come from the cache; the
+    name lookups and the deletes each go out as batched requests, so N
+    deletes cost about 2 * ceil(N / 100) round-trips instead of 2N.
+    Returns the number of Drive items deleted.
+    """
+    service = get_service()
+    targets = {}
+    for drive_path in drive_paths:
+        dataset_folder_id, rel_path = resolve_dataset_path(drive_path)
+        if not rel_path:
+            logger.warning("⚠️ Refusing to delete root dataset folder.")
+            continue
+        parent_path, target_name = os.path.split(rel_path)
+        try:
+            parent_id = get_folder_id(parent_path, parent_id=dataset_folder_id)
+        except FileNotFoundError:
+            logger.warning("⚠️ Drive delete failed: %s not found", drive_path)
+            continue
+        targets[drive_path] = (parent_id, target_name)
+
+    lookups = run_batch(service, [
+        (path, _lookup_request(service, parent_id, name, "id, mimeType"))
+        for path, (parent_id, name) in targets.items()
+    ])
+
+    deletes, meta = [], {}
+    for path, (response, exception) in lookups.items():
+        files = (response or {}).get("files", [])
+        if exception is not None or not files:
+            logger.warning("⚠️ Drive delete failed: %s not found", path)
+            continue
+        for file in files:
+            deletes.append((file["id"], service.files().delete(fileId=file["id"], supportsAllDrives=True)))
+            meta[file["id"]] = (path, file["mimeType"])
+
+    deleted = 0
+    for file_id, (_, exception) in run_batch(service, deletes).items():
+        path, mime = meta[file_id]
+        if exception is not None:
+            logger.warning("⚠️ Failed to delete %s: %s", path, exception)
+            continue
+        if mime == FOLDER_MIME:
+            invalidate_folder_cache(*targets[path])
+        deleted += 1
+        logger.info("🗑️ Deleted %s (%s)", path, mime)
+    return deleted
 
 
 # -------- Move --------
@@ -220,27 +819,88 @@ def move_in_drive(old_drive_path, new_drive_path):
     old_parent, old_filename = os.path.split(old_rel_path)
     new_parent, new_filename = os.path.split(new_rel_path)
 
-    old_parent_id = get_folder_id(old_parent, parent_id=old_dataset_id)
-    new_parent_id = get_folder_id(new_parent, parent_id=new_dataset_id, create=True)
-
-    query = f"name='{old_filename}' and '{old_parent_id}' in parents and trashed=false"
-    results = service.files().list(q=query, fields="files(id)").execute()
-    files = results.get("files", [])
-    if not files:
-        print(f"⚠️ {old_drive_path} not found in Drive for move")
+    # id + current parents in one call; no separate files().get needed
+    files, old_parent_id = _find_in_folder(
+        service, old_dataset_id, old_parent, old_filename, "id, mimeType, parents"
+    )
+    match = files[0] if files else None
+    if not match:
+        logger.warning("⚠️ %s not found in Drive for move", old_drive_path)
         return None
 
-    file_id = files[0]["id"]
-    file = service.files().get(fileId=file_id, fields="parents").execute()
-    prev_parents = ",".join(file.get("parents", []))
+    new_parent_id = get_folder_id(new_parent, parent_id=new_dataset_id, create=True)
+    file_id = match["id"]
+    prev_parents = ",".join(match.get("parents", []))
 
-    updated = service.files().update(
+    updated = execute_with_retry(service.files().update(
         fileId=file_id,
         addParents=new_parent_id,
         removeParents=prev_parents,
         body={"name": new_filename},
-        fields="id, parents"
-    ).execute()
+        fields="id",
+        supportsAllDrives=True,
+    ))
 
-    print(f"📂 Moved {old_drive_path} -> {new_drive_path}")
+    # Plain files aren't in the folder cache or the category tree
+    if match.get("mimeType") == FOLDER_MIME:
+        invalidate_folder_cache(old_parent_id, old_filename)
+
+    logger.info("📂 Moved %s -> %s", old_drive_path, new_drive_path)
     return updated["id"]
+
+
+def move_many(pairs):
+    """
+    Move/rename many [(old_drive_path, new_drive_path), ...] inside dataset.
+    Lookups (id + current parents in one call) and updates are batched.
+    Destination folders are only resolved/created for sources that exist.
+    Returns {old_drive_path: new file id} for the moves that succeeded.
+    """
+    service = get_service()
+    targets = {}
+    for old_drive_path, new_drive_path in pairs:
+        old_dataset_id, old_rel_path = resolve_dataset_path(old_drive_path)
+        old_parent, old_filename = os.path.split(old_rel_path)
+        try:
+            old_parent_id = get_folder_id(old_parent, parent_id=old_dataset_id)
+        except FileNotFoundError:
+            logger.warning("⚠️ %s not found in Drive for move", old_drive_path)
+            continue
+        targets[old_drive_path] = (old_parent_id, old_filename, new_drive_path)
+
+    lookups = run_batch(service, [
+        (old_path, _lookup_request(service, t[0], t[1], "id, mimeType, parents"))
+        for old_path, t in targets.items()
+    ])
+
+    updates, folder_moves = [], set()
+    for old_path, (response, exception) in lookups.items():
+        files = (response or {}).get("files", [])
+        if exception is not None or not files:
+            logger.warning("⚠️ %s not found in Drive for move", old_path)
+            continue
+        new_dataset_id, new_rel_path = resolve_dataset_path(targets[old_path][2], create=True)
+        new_parent, new_filename = os.path.split(new_rel_path)
+        new_parent_id = get_folder_id(new_parent, parent_id=new_dataset_id, create=True)
+        if files[0].get("mimeType") == FOLDER_MIME:
+            folder_moves.add(old_path)
+        updates.append((old_path, service.files().update(
+            fileId=files[0]["id"],
+            addParents=new_parent_id,
+            removeParents=",".join(files[0].get("parents", [])),
+            body={"name": new_filename},
+            fields="id",
+            supportsAllDrives=True,
+        )))
+
+    moved = {}
+    for old_path, (response, exception) in run_batch(service, updates).items():
+        old_parent_id, old_filename, new_path = targets[old_path]
+        if exception is not None:
+            logger.warning("⚠️ Drive move failed for %s: %s", old_path, exception)
+            continue
+        if old_path in folder_moves:
+            invalidate_folder_cache(old_parent_id, old_filename)
+        moved[old_path] = response["id"]
+        logger.info("📂 Moved %s -> %s", old_path, new_path)
+    return moved